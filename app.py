@@ -1,142 +1,350 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
 import os
 import logging
-from datetime import datetime, timedelta
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from dateutil.relativedelta import relativedelta
 from dotenv import load_dotenv
 from fredapi import Fred
 from logger_config import setup_logging
 
+# Load environment variables (before logging, which reads LOG_LEVEL)
+load_dotenv()
+fred_api_key = os.getenv("FRED_API_KEY")
+
 # Set up logging
 logger = setup_logging()
 
-# Load environment variables
-load_dotenv()
-fred_api_key = os.getenv("FRED_API_KEY")
+# FRED REST endpoint used for the bulk prefetch
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+
+# Have FRED average monthly series into quarters server-side so they are not
+# over-fetched; quarterly series are returned unchanged
+QUARTERLY_AGGREGATION = {'frequency': 'q', 'aggregation_method': 'avg'}
+
+# Lifetime in seconds of cached FRED data, both in st.cache_data and in the
+# per-session copy kept by main()
+DATA_TTL = 3600
+
+# Largest window offered by the quarters slider; prefetching uses it so every
+# slider position can be served from the same downloaded series.
+MAX_QUARTERS = 20
+
+# Above this many points line charts switch to WebGL rendering
+WEBGL_THRESHOLD = 2000
+
+# Available indicators with their FRED series ID, units and description
+INDICATORS = MappingProxyType({
+    "Gross Domestic Product (GDP)": {
+        "series_id": "GDP",
+        "units": "Billions of Dollars",
+        "description": "GDP is the total monetary or market value of all finished goods and services produced within a country's borders in a specific time period."
+    },
+    "Real GDP": {
+        "series_id": "GDPC1",
+        "units": "Billions of Chained 2017 Dollars",
+        "description": "Real GDP is a macroeconomic measure of the value of economic output adjusted for price changes (inflation or deflation)."
+    },
+    "GDP Growth Rate": {
+        "series_id": "A191RL1Q225SBEA",
+        "units": "Percent Change from Preceding Period",
+        "description": "This measures the annualized percentage change in GDP from the previous quarter."
+    },
+    "Personal Consumption Expenditures": {
+        "series_id": "PCE",
+        "units": "Billions of Dollars",
+        "description": "PCE measures consumer spending on goods and services in the U.S. economy."
+    },
+    "Unemployment Rate": {
+        "series_id": "UNRATE",
+        "units": "Percent",
+        "description": "The unemployment rate represents the number of unemployed as a percentage of the labor force."
+    },
+    "Consumer Price Index (CPI)": {
+        "series_id": "CPIAUCSL",
+        "units": "Index 1982-1984=100",
+        "description": "CPI measures the average change over time in the prices paid by urban consumers for a market basket of consumer goods and services."
+    },
+    "Federal Funds Rate": {
+        "series_id": "FEDFUNDS",
+        "units": "Percent",
+        "description": "The federal funds rate is the interest rate at which depository institutions trade federal funds with each other overnight."
+    }
+})
+INDICATOR_NAMES = tuple(INDICATORS.keys())
+SERIES_IDS = tuple(details["series_id"] for details in INDICATORS.values())
+CHART_TYPES = ('Line', 'Bar', 'Area')
+
+@st.cache_resource
+def _fred_client(api_key):
+    """Create the FRED API client once per process for a given key."""
+    logger.info("Initializing FRED API client")
+    return Fred(api_key=api_key)
 
 def initialize_fred():
     """Initialize FRED API client."""
     try:
-        logger.info("Initializing FRED API client")
+        # Checked outside the cache so a key added later is picked up on rerun
         if not fred_api_key:
             logger.error("FRED API key not found in environment variables")
             st.error("FRED API key not found. Please check your .env file.")
             return None
-        return Fred(api_key=fred_api_key)
+        return _fred_client(fred_api_key)
     except Exception as e:
         logger.error(f"Error initializing FRED API client: {str(e)}", exc_info=True)
         st.error(f"Error initializing FRED API: {str(e)}")
         return None
 
-def get_economic_data(fred, series_id, title, units="", quarters=8):
-    """Fetch economic data from FRED API."""
+def _date_window(quarters):
+    """Return the (start, end) dates covering the last `quarters` quarters."""
+    # Dates are kept at day resolution so cache keys stay stable between reruns
+    end_date = date.today()
+    # Start on a quarter boundary so the window holds exactly `quarters`
+    # complete quarters before the current one
+    quarter_start = end_date.replace(month=(end_date.month - 1) // 3 * 3 + 1, day=1)
+    start_date = quarter_start - relativedelta(months=3 * quarters)
+    return start_date, end_date
+
+@st.cache_resource
+def _http_session():
+    """Create a pooled HTTP session so prefetches reuse keep-alive connections."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=len(SERIES_IDS)))
+    return session
+
+def _fetch_observations(session, fred_key, series_id, start, end) -> pd.Series:
+    """Fetch a series from the FRED REST API, shaped like `Fred.get_series` output."""
+    # requests' exception messages include the full URL, and with it the API
+    # key, so only the exception type and FRED's own message are re-raised
+    try:
+        response = session.get(
+            FRED_OBSERVATIONS_URL,
+            params={
+                'series_id': series_id,
+                'api_key': fred_key,
+                'file_type': 'json',
+                'observation_start': start.isoformat(),
+                'observation_end': end.isoformat(),
+                **QUARTERLY_AGGREGATION
+            },
+            timeout=10
+        )
+    except requests.RequestException as e:
+        raise ValueError(f"{series_id}: {type(e).__name__}") from None
+    
+    if not response.ok:
+        try:
+            message = response.json().get('error_message', '')
+        except ValueError:
+            message = ''
+        raise ValueError(f"{series_id}: HTTP {response.status_code} {message}".rstrip())
+    observations = response.json()['observations']
+    
+    # FRED reports missing values as "."; coerce them to NaN like fredapi does
+    return pd.Series(
+        pd.to_numeric([obs['value'] for obs in observations], errors='coerce'),
+        index=pd.to_datetime([obs['date'] for obs in observations]),
+        name=series_id
+    )
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def prefetch_all(fred_key, series_ids, quarters=MAX_QUARTERS):
+    """Fetch every indicator concurrently so switching indicators hits a warm cache."""
+    start_date, end_date = _date_window(quarters)
+    logger.info(f"Prefetching {len(series_ids)} series from FRED API")
+    
+    session = _http_session()
+    with ThreadPoolExecutor(max_workers=len(series_ids) or 1) as executor:
+        futures = {
+            series_id: executor.submit(
+                _fetch_observations, session, fred_key, series_id, start_date, end_date
+            )
+            for series_id in series_ids
+        }
+    
+    results = {}
+    for series_id, future in futures.items():
+        try:
+            results[series_id] = future.result()
+        except Exception as e:
+            # Leave it out; get_economic_data falls back to a single fetch
+            logger.warning(f"Prefetch failed for series {series_id}: {str(e)}")
+    return results
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def _fetch_series(_fred, series_id: str, start: date, end: date) -> pd.Series:
+    """Fetch a raw series from FRED, cached for an hour across reruns."""
+    logger.info(f"Requesting series {series_id} from FRED API")
+    return _fred.get_series(series_id, start, end, **QUARTERLY_AGGREGATION)
+
+def get_economic_data(fred, series_id, title, units="", quarters=8, prefetched=None):
+    """Fetch economic data from FRED API, using prefetched series when available."""
     try:
-        logger.info(f"Fetching {title} data with series ID: {series_id}")
+        logger.debug("Fetching %s data with series ID: %s", title, series_id)
         
         # Calculate start date (8 quarters back from today)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=quarters * 91)  # Approximate quarters
+        start_date, end_date = _date_window(quarters)
         
-        # Get data from FRED
-        data = fred.get_series(series_id, start_date, end_date)
+        if prefetched and series_id in prefetched:
+            # Trim the prefetched (widest) window down to the requested range
+            data = prefetched[series_id]
+            data = data[data.index >= pd.Timestamp(start_date)]
+        else:
+            # Get data from FRED (cached)
+            data = _fetch_series(fred, series_id, start_date, end_date)
         
         if data.empty:
             logger.warning(f"No data returned for series {series_id}")
             return None
             
         # Convert to DataFrame and format
-        df = pd.DataFrame(data)
-        df.reset_index(inplace=True)
-        df.columns = ['Date', 'Value']
+        df = pd.DataFrame({'Date': data.index.to_numpy(), 'Value': data.to_numpy()})
         
-        # Format date to quarters
-        df['Quarter'] = df['Date'].dt.to_period('Q').astype(str)
+        # Format date to quarters ("YYYYQn") with numpy datetime arithmetic
+        months = df['Date'].values.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+        quarter_nums = months.astype(np.int64) % 12 // 3 + 1
+        df['Quarter'] = np.char.add(
+            np.char.add(years.astype(str), 'Q'),
+            quarter_nums.astype(str)
+        )
         
-        logger.info(f"Successfully retrieved {len(df)} data points for {title}")
-        return {
+        logger.debug("Successfully retrieved %d data points for %s", len(df), title)
+        data_dict = {
             'data': df,
             'title': title,
             'units': units
         }
+        # Computed once per fetch so later reruns only need a lookup
+        data_dict['pct_change'] = calculate_change(data_dict)
+        return data_dict
     except Exception as e:
         logger.error(f"Error fetching data for {series_id}: {str(e)}", exc_info=True)
         st.error(f"Error fetching {title} data: {str(e)}")
         return None
 
+@st.cache_resource(show_spinner=False)
+def build_chart(df: pd.DataFrame, title, units, chart_type) -> go.Figure:
+    """Build the Plotly figure for a series, cached on the data and chart options."""
+    # cache_resource hands back the same object instead of unpickling it, which
+    # for a Figure would re-run full validation; callers must not mutate it
+    # Raw arrays avoid Plotly Express's DataFrame introspection
+    x = df['Quarter'].values
+    y = df['Value'].values
+    hovertemplate = "%{x}<br>" + f"{title} ({units})" + ": %{y}<extra></extra>"
+    
+    # SVG scatter becomes sluggish on long series; WebGL keeps it responsive
+    scatter = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    
+    if chart_type == 'Line':
+        trace = scatter(x=x, y=y, mode='lines+markers', hovertemplate=hovertemplate)
+    elif chart_type == 'Bar':
+        trace = go.Bar(x=x, y=y, marker_color='#1E88E5', hovertemplate=hovertemplate)
+    elif chart_type == 'Area':
+        trace = go.Scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            fill='tozeroy',
+            line_color='#1E88E5',
+            hovertemplate=hovertemplate
+        )
+    else:  # Default to line
+        trace = scatter(x=x, y=y, mode='lines', hovertemplate=hovertemplate)
+    
+    fig = go.Figure(trace)
+    
+    # Update layout
+    fig.update_layout(
+        title=f"{title} - Last {len(df)} Quarters",
+        xaxis_title="",
+        yaxis_title=f"{title} ({units})",
+        template="plotly_white",
+        height=500
+    )
+    
+    return fig
+
 def create_chart(data_dict, chart_type):
     """Create chart based on the selected type."""
     try:
-        logger.info(f"Creating {chart_type} chart for {data_dict['title']}")
-        df = data_dict['data']
-        title = data_dict['title']
-        units = data_dict['units']
-        
-        if chart_type == 'Line':
-            fig = px.line(
-                df, 
-                x='Quarter', 
-                y='Value',
-                title=f"{title} - Last {len(df)} Quarters",
-                labels={'Value': f"{title} ({units})", 'Quarter': ''},
-                markers=True
-            )
-        elif chart_type == 'Bar':
-            fig = px.bar(
-                df, 
-                x='Quarter', 
-                y='Value',
-                title=f"{title} - Last {len(df)} Quarters",
-                labels={'Value': f"{title} ({units})", 'Quarter': ''},
-                color_discrete_sequence=['#1E88E5']
-            )
-        elif chart_type == 'Area':
-            fig = px.area(
-                df, 
-                x='Quarter', 
-                y='Value',
-                title=f"{title} - Last {len(df)} Quarters",
-                labels={'Value': f"{title} ({units})", 'Quarter': ''},
-                color_discrete_sequence=['#1E88E5']
-            )
-        else:  # Default to line
-            fig = px.line(
-                df, 
-                x='Quarter', 
-                y='Value',
-                title=f"{title} - Last {len(df)} Quarters",
-                labels={'Value': f"{title} ({units})", 'Quarter': ''}
-            )
-            
-        # Update layout
-        fig.update_layout(
-            xaxis_title="",
-            yaxis_title=f"{title} ({units})",
-            template="plotly_white",
-            height=500
+        logger.debug("Creating %s chart for %s", chart_type, data_dict['title'])
+        return build_chart(
+            data_dict['data'],
+            data_dict['title'],
+            data_dict['units'],
+            chart_type
         )
-        
-        return fig
     except Exception as e:
         logger.error(f"Error creating chart: {str(e)}", exc_info=True)
         st.error(f"Error creating chart: {str(e)}")
         return None
 
+@st.fragment
+def render_chart(data_dict):
+    """Render the chart and raw data; widget changes here rerun only this fragment."""
+    # Chart type selection
+    chart_type = st.selectbox(
+        "Select Chart Type",
+        CHART_TYPES,
+        index=0,
+        key="chart_type"
+    )
+    
+    # Display chart
+    fig = create_chart(data_dict, chart_type)
+    if fig:
+        # The figure carries its own template, so skip Streamlit's theming pass
+        st.plotly_chart(fig, use_container_width=True, theme=None)
+        
+        # Data table with toggle; only built while the toggle is on.
+        # FRED returns observations in date order, so reversing
+        # gives newest first without sorting.
+        if st.checkbox("Show Raw Data", key="show_raw"):
+            st.dataframe(
+                data_dict['data'][['Quarter', 'Value']].iloc[::-1],
+                use_container_width=True
+            )
+
 def calculate_change(data_dict):
     """Calculate percentage change from oldest to newest data point."""
+    if 'pct_change' in data_dict:
+        return data_dict['pct_change']
     try:
-        df = data_dict['data']
-        if len(df) >= 2:
-            oldest = df['Value'].iloc[0]
-            newest = df['Value'].iloc[-1]
-            pct_change = ((newest - oldest) / oldest) * 100
-            return pct_change
+        values = data_dict['data']['Value'].values
+        if values.size >= 2 and values[0]:
+            return (values[-1] - values[0]) / values[0] * 100.0
         return None
     except Exception as e:
         logger.error(f"Error calculating change: {str(e)}")
         return None
 
+def calculate_statistics(data_dict):
+    """Calculate latest, minimum, maximum, average and change in one pass over the data."""
+    df = data_dict['data']
+    values = df['Value'].to_numpy()
+    quarters = df['Quarter'].to_numpy()
+    
+    # nan-aware reductions match pandas' skipna behaviour
+    imin, imax = np.nanargmin(values), np.nanargmax(values)
+    return {
+        'latest_value': values[-1],
+        'latest_quarter': quarters[-1],
+        'min_value': values[imin],
+        'min_quarter': quarters[imin],
+        'max_value': values[imax],
+        'max_quarter': quarters[imax],
+        'mean_value': np.nanmean(values),
+        'pct_change': calculate_change(data_dict)
+    }
+
 def main():
     try:
         # Page config
@@ -161,47 +369,9 @@ def main():
         # Economic indicators selection
         st.sidebar.subheader("Economic Indicators")
         
-        indicators = {
-            "Gross Domestic Product (GDP)": {
-                "series_id": "GDP",
-                "units": "Billions of Dollars"
-            },
-            "Real GDP": {
-                "series_id": "GDPC1", 
-                "units": "Billions of Chained 2017 Dollars"
-            },
-            "GDP Growth Rate": {
-                "series_id": "A191RL1Q225SBEA", 
-                "units": "Percent Change from Preceding Period"
-            },
-            "Personal Consumption Expenditures": {
-                "series_id": "PCE", 
-                "units": "Billions of Dollars"
-            },
-            "Unemployment Rate": {
-                "series_id": "UNRATE", 
-                "units": "Percent"
-            },
-            "Consumer Price Index (CPI)": {
-                "series_id": "CPIAUCSL", 
-                "units": "Index 1982-1984=100"
-            },
-            "Federal Funds Rate": {
-                "series_id": "FEDFUNDS", 
-                "units": "Percent"
-            }
-        }
-        
         selected_indicator = st.sidebar.selectbox(
             "Select Economic Indicator", 
-            list(indicators.keys()),
-            index=0
-        )
-        
-        # Chart type selection
-        chart_type = st.sidebar.selectbox(
-            "Select Chart Type",
-            ["Line", "Bar", "Area"],
+            INDICATOR_NAMES,
             index=0
         )
         
@@ -209,86 +379,71 @@ def main():
         quarters = st.sidebar.slider(
             "Number of quarters to display",
             min_value=4,
-            max_value=20,
+            max_value=MAX_QUARTERS,
             value=8
         )
         
         # Get selected indicator details
-        indicator_details = indicators[selected_indicator]
+        indicator_details = INDICATORS[selected_indicator]
         series_id = indicator_details["series_id"]
         units = indicator_details["units"]
         
-        # Get data
-        data_dict = get_economic_data(fred, series_id, selected_indicator, units, quarters)
-        #Log everytime the data is pulled
-        if data_dict:
-            logger.info(f"Successfully pulled {len(data_dict['data'])} data points for {selected_indicator}")
+        # Get data, reusing the previous run's data and statistics when the
+        # selection is unchanged (e.g. a manual rerun); chart widgets rerun
+        # only the render_chart fragment. The time bucket expires the session
+        # copy on the same schedule as the data caches.
+        data_key = (series_id, quarters, int(time.time() // DATA_TTL))
+        if st.session_state.get('last_key') == data_key:
+            data_dict = st.session_state['data_dict']
         else:
-            logger.warning(f"No data returned for {selected_indicator}")
+            # Warm the cache for every indicator in parallel
+            prefetched = prefetch_all(fred_api_key, SERIES_IDS)
+            data_dict = get_economic_data(fred, series_id, selected_indicator, units, quarters, prefetched)
+            #Log everytime the data is pulled
+            if data_dict:
+                logger.debug("Successfully pulled %d data points for %s", len(data_dict['data']), selected_indicator)
+                data_dict['stats'] = calculate_statistics(data_dict)
+                st.session_state['last_key'] = data_key
+                st.session_state['data_dict'] = data_dict
+            else:
+                logger.warning(f"No data returned for {selected_indicator}")
         
         if data_dict and not data_dict['data'].empty:
             # Main content area
             col1, col2 = st.columns([7, 3])
             
             with col1:
-                # Display chart
-                fig = create_chart(data_dict, chart_type)
-                if fig:
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Data table with toggle
-                    with st.expander("Show Raw Data"):
-                        st.dataframe(
-                            data_dict['data'][['Quarter', 'Value']].sort_values('Quarter', ascending=False),
-                            use_container_width=True
-                        )
+                render_chart(data_dict)
             
             with col2:
                 # Key statistics
                 st.subheader("Key Statistics")
                 
-                df = data_dict['data']
-                latest_value = df['Value'].iloc[-1]
-                latest_quarter = df['Quarter'].iloc[-1]
-                
-                # Calculate change
-                pct_change = calculate_change(data_dict)
+                stats = data_dict['stats']
+                pct_change = stats['pct_change']
                 
                 # Metrics
                 st.metric(
-                    label=f"Latest Value ({latest_quarter})",
-                    value=f"{latest_value:,.2f} {units}",
+                    label=f"Latest Value ({stats['latest_quarter']})",
+                    value=f"{stats['latest_value']:,.2f} {units}",
                     delta=f"{pct_change:.2f}%" if pct_change is not None else None
                 )
                 
                 # Min, max, average
                 col_min, col_max = st.columns(2)
                 with col_min:
-                    min_val = df['Value'].min()
-                    min_quarter = df.loc[df['Value'].idxmin(), 'Quarter']
-                    st.metric("Minimum", f"{min_val:,.2f}")
-                    st.caption(f"Quarter: {min_quarter}")
+                    st.metric("Minimum", f"{stats['min_value']:,.2f}")
+                    st.caption(f"Quarter: {stats['min_quarter']}")
                 
                 with col_max:
-                    max_val = df['Value'].max()
-                    max_quarter = df.loc[df['Value'].idxmax(), 'Quarter']
-                    st.metric("Maximum", f"{max_val:,.2f}")
-                    st.caption(f"Quarter: {max_quarter}")
+                    st.metric("Maximum", f"{stats['max_value']:,.2f}")
+                    st.caption(f"Quarter: {stats['max_quarter']}")
                 
-                st.metric("Average", f"{df['Value'].mean():,.2f}")
+                st.metric("Average", f"{stats['mean_value']:,.2f}")
                 
                 # Description of indicator
                 st.subheader("About this Indicator")
-                descriptions = {
-                    "Gross Domestic Product (GDP)": "GDP is the total monetary or market value of all finished goods and services produced within a country's borders in a specific time period.",
-                    "Real GDP": "Real GDP is a macroeconomic measure of the value of economic output adjusted for price changes (inflation or deflation).",
-                    "GDP Growth Rate": "This measures the annualized percentage change in GDP from the previous quarter.",
-                    "Personal Consumption Expenditures": "PCE measures consumer spending on goods and services in the U.S. economy.",
-                    "Unemployment Rate": "The unemployment rate represents the number of unemployed as a percentage of the labor force.",
-                    "Consumer Price Index (CPI)": "CPI measures the average change over time in the prices paid by urban consumers for a market basket of consumer goods and services.",
-                    "Federal Funds Rate": "The federal funds rate is the interest rate at which depository institutions trade federal funds with each other overnight."
-                }
-                st.markdown(descriptions.get(selected_indicator, "No description available."))
+                st.markdown(indicator_details.get("description", "No description available."))
                 
         else:
             st.error(f"No data available for {selected_indicator}. Please try another indicator.")
@@ -1,25 +1,58 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
+from functools import lru_cache
+
+# Background listener that performs the actual console/file writes
+_listener = None
+
+def _stop_listener():
+    """Flush queued records and close the listener's handlers."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(_stop_listener)
 
 def setup_logging():
     """Set up logging configuration for the application."""
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-    
     # Get current date for log file naming
     current_date = datetime.now().strftime('%Y-%m-%d')
     log_file = f'logs/app_{current_date}.log'
     
+    # Handlers are only rebuilt when the date (and so the log file) changes
+    return _configure_logger(log_file)
+
+@lru_cache(maxsize=1)
+def _configure_logger(log_file):
+    """Attach handlers writing to `log_file`, replacing any previous ones."""
+    global _listener
+    # Create logs directory if it doesn't exist
+    if not os.path.exists('logs'):
+        os.makedirs('logs')
+    
     # Create logger
     logger = logging.getLogger('fred_dashboard')
-    logger.setLevel(logging.DEBUG)
+    # Set LOG_LEVEL=INFO in production to skip formatting per-request debug logs
+    level_name = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+    level = logging.getLevelName(level_name)
+    # getLevelName returns a "Level X" string rather than a number for unknown names
+    valid_level = isinstance(level, int)
+    if not valid_level:
+        level = logging.DEBUG
+    logger.setLevel(level)
     
-    # Clear any existing handlers to avoid duplicate logs
-    if logger.hasHandlers():
-        logger.handlers.clear()
+    # Close and clear any existing handlers to avoid duplicate logs
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    _stop_listener()
     
     # Create handlers
     console_handler = logging.StreamHandler()
@@ -39,9 +72,18 @@ def setup_logging():
     console_handler.setFormatter(console_format)
     file_handler.setFormatter(file_format)
     
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Logging calls only enqueue records; a background thread does the I/O
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
     
     logger.info("Logging initialized")
+    if not valid_level:
+        logger.warning(f"Unknown LOG_LEVEL '{level_name}', falling back to DEBUG")
     return logger